@@ -0,0 +1,127 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import json
+from decimal import Decimal
+from .exceptions import BitcoinRpcValueError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+AMOUNT_FORMATS = ("float", "decimal", "satoshi")
+
+_SATOSHIS_PER_BTC = Decimal(100000000)
+
+# Keys holding BTC amounts in bitcoind responses (converted in "satoshi" format)
+_AMOUNT_KEYS = frozenset({
+    "amount", "value", "fee", "fees", "base", "modified", "ancestor", "descendant",
+    "total_fee", "mempoolminfee", "minrelaytxfee", "incrementalrelayfee",
+    "relayfee", "incrementalfee", "feerate", "maxburnamount", "minfeefilter", "modifiedfee"
+})
+
+
+class JsonCodec:
+    """Encodes JSON-RPC requests and decodes responses straight from bytes.
+
+    orjson is used when installed, otherwise the stdlib json module. The amount_format
+    sets how floats are parsed: "float" (default), "decimal" (all floats as Decimal) or
+    "satoshi" (BTC amounts as int satoshis, other floats as float). The "decimal" and
+    "satoshi" formats always decode with the stdlib json module.
+    """
+
+    def __init__(self, amount_format: str = "float", use_orjson: bool = True):
+
+        self.__amount_format = self.__validate_amount_format(amount_format)
+        self.__use_orjson = self.__validate_use_orjson(use_orjson)
+        self.__envelopes = {}
+
+        if self.__use_orjson and orjson is not None:
+            self.__dumps = lambda obj: orjson.dumps(obj, default=_default)
+        else:
+            self.__dumps = lambda obj: json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+        if self.__amount_format == "decimal":
+            self.__loads = lambda data: json.loads(data, parse_float=Decimal)
+        elif self.__amount_format == "satoshi":
+            self.__loads = lambda data: json.loads(data, parse_float=Decimal, object_pairs_hook=_satoshi_hook)
+        elif self.__use_orjson and orjson is not None:
+            self.__loads = orjson.loads
+        else:
+            self.__loads = json.loads
+
+    def __repr__(self):
+        return f"JsonCodec(amount_format='{self.__amount_format}', use_orjson={self.__use_orjson})"
+
+    def __validate_amount_format(self, amount_format: str) -> str:
+        if amount_format not in AMOUNT_FORMATS:
+            raise BitcoinRpcValueError(f"Invalid value for amount_format: {amount_format}")
+
+        return amount_format
+
+    def __validate_use_orjson(self, use_orjson: bool) -> bool:
+        if not isinstance(use_orjson, bool):
+            raise BitcoinRpcValueError(f"Invalid value for use_orjson: {use_orjson}")
+
+        return use_orjson
+
+    def encode(self, obj) -> bytes:
+        return self.__dumps(obj)
+
+    def decode(self, data: bytes):
+        return self.__loads(data)
+
+    def encode_request(self, rpc_id: int, method: str, params: list) -> bytes:
+        """Encodes a JSON-RPC 1.0 request, reusing the pre-serialized envelope of the method."""
+        envelope = self.__envelopes.get(method)
+        if envelope is None:
+            envelope = b',"method":' + self.__dumps(method) + b',"params":'
+            self.__envelopes[method] = envelope
+
+        return (b'{"jsonrpc":"1.0","id":' + str(rpc_id).encode() + envelope
+                + (self.__dumps(params) if params else b"[]") + b"}")
+
+    def encode_batch(self, requests: list) -> bytes:
+        """Encodes a JSON-RPC batch from a list of (rpc_id, method, params) tuples."""
+        return b"[" + b",".join(self.encode_request(*request) for request in requests) + b"]"
+
+    def get_amount_format(self) -> str:
+        return self.__amount_format
+
+    def is_orjson_enabled(self) -> bool:
+        return self.__use_orjson and orjson is not None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _satoshi_hook(pairs: list) -> dict:
+    obj = {}
+    for key, value in pairs:
+        if isinstance(value, Decimal):
+            if key in _AMOUNT_KEYS:
+                value = int((value * _SATOSHIS_PER_BTC).to_integral_value())
+            else:
+                value = float(value)
+        elif isinstance(value, list):
+            value = _float_items(value)
+        obj[key] = value
+
+    return obj
+
+
+def _float_items(items: list) -> list:
+    # objects in the list were already converted by the hook, nested lists are not
+    converted = []
+    for item in items:
+        if isinstance(item, Decimal):
+            item = float(item)
+        elif isinstance(item, list):
+            item = _float_items(item)
+        converted.append(item)
+
+    return converted
@@ -0,0 +1,72 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import time
+import threading
+from .exceptions import BitcoinRpcValueError
+
+_local = threading.local()
+
+
+class Deadline:
+    """Time budget shared by all RPC calls made in the current thread within a with block.
+
+    Each RPC call gets at most the remaining budget as its connect and read timeouts,
+    and its response is dropped once the budget runs out while it is being read. Calls
+    made once the budget is exhausted fail fast with BitcoinRpcTimeoutError without
+    being sent. Nested deadlines can only shorten the budget.
+    """
+
+    def __init__(self, timeout: float):
+
+        self.__timeout = self.__validate_timeout(timeout)
+        self.__expiry = None
+
+    def __repr__(self):
+        return f"Deadline(timeout={self.__timeout})"
+
+    def __enter__(self):
+        expiry = time.monotonic() + self.__timeout
+        stack = _get_stack()
+        if stack:
+            expiry = min(expiry, stack[-1].__expiry)
+        self.__expiry = expiry
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _get_stack().remove(self)
+        return False
+
+    def __validate_timeout(self, timeout: float) -> float:
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout < 0:
+            raise BitcoinRpcValueError(f"Invalid value for timeout: {timeout}")
+
+        return float(timeout)
+
+    def get_timeout(self) -> float:
+        return self.__timeout
+
+    def get_remaining(self) -> float:
+        """Returns the seconds left in the budget, or the full timeout if not entered yet."""
+        if self.__expiry is None:
+            return self.__timeout
+        return max(self.__expiry - time.monotonic(), 0.0)
+
+    def is_expired(self) -> bool:
+        return self.get_remaining() <= 0
+
+
+def get_remaining() -> float:
+    """Returns the seconds left in the innermost active deadline of the current thread, or None."""
+    stack = _get_stack()
+    if not stack:
+        return None
+    return stack[-1].get_remaining()
+
+
+def _get_stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
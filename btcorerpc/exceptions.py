@@ -30,3 +30,6 @@ class BitcoinRpcServerError(BitcoinRpcError):
 
 class BitcoinRpcValueError(BitcoinRpcError):
     pass
+
+class BitcoinRpcTimeoutError(BitcoinRpcConnectionError):
+    pass
@@ -2,18 +2,31 @@
 # Distributed under the MIT License. See the accompanying file LICENSE.
 
 import os
+import time
+import queue
+import atexit
 import logging
+import threading
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 BTCORE_HOME = os.getenv("BTCORE_HOME")
 BTCORE_HOME = Path(BTCORE_HOME) if BTCORE_HOME else Path.home()
 
+# log arguments of these types can't change after the logging call
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+_QUEUE_SIZE = 10000
+
 def create(logger_name):
 
     set_logging = True if os.getenv("BTCORERPC_LOG") == "1" else False
     set_logging_console = True if os.getenv("BTCORERPC_LOG_CONSOLE") == "1" else False
     set_logging_debug = True if os.getenv("BTCORERPC_LOG_DEBUG") == "1" else False
+    set_logging_async = True if os.getenv("BTCORERPC_LOG_ASYNC") == "1" else False
+    logging_sample = _get_env_int("BTCORERPC_LOG_SAMPLE")
+    logging_rate = _get_env_int("BTCORERPC_LOG_RATE")
+    logging_queue_size = _get_env_int("BTCORERPC_LOG_QUEUE") or _QUEUE_SIZE
 
     logging_level = logging.CRITICAL if not set_logging else logging.INFO
     if set_logging_debug:
@@ -27,13 +40,138 @@ def create(logger_name):
     logger.setLevel(logging_level)
     logger_format = logging.Formatter("%(asctime)s [%(name)s] %(levelname)s - %(message)s")
 
+    handlers = []
     file_handler = RotatingFileHandler(Path.joinpath(log_dir, log_file), maxBytes=10000000, backupCount=3)
     file_handler.setFormatter(logger_format)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
 
     if set_logging_console:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(logger_format)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    listener = None
+    queue_handler = None
+    if set_logging_async and (set_logging or set_logging_debug):
+        log_queue = queue.Queue(maxsize=logging_queue_size)
+        listener = _QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        queue_handler = _LazyQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+
+    rate_filter = None
+    if logging_sample > 1:
+        logger.addFilter(_SampleFilter(logging_sample))
+    if logging_rate > 0:
+        rate_filter = _RateLimitFilter(logging_rate)
+        logger.addFilter(rate_filter)
+
+    if listener is not None or rate_filter is not None:
+        atexit.register(_shutdown, logger, handlers, listener, queue_handler, rate_filter)
 
     return logger
+
+def _get_env_int(name):
+    value = os.getenv(name, "")
+    return int(value) if value.isdigit() else 0
+
+def _shutdown(logger, handlers, listener, queue_handler, rate_filter):
+    if listener is not None:
+        # writes out the queued records before logging.shutdown closes the handlers
+        listener.stop()
+
+    queue_dropped = queue_handler.get_dropped_count() if queue_handler is not None else 0
+    rate_dropped = rate_filter.get_dropped_count() if rate_filter is not None else 0
+    if queue_dropped or rate_dropped:
+        # the queue is no longer read, so the warning goes to the handlers directly
+        record = logger.makeRecord(logger.name, logging.WARNING, __file__, 0,
+                                   "Log records dropped: queue full: %d, rate limit: %d",
+                                   (queue_dropped, rate_dropped), None)
+        for handler in handlers:
+            handler.handle(record)
+
+
+class _QueueListener(QueueListener):
+    """Waits for room in the bounded queue to stop, instead of failing when the queue is full."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Queues records with scalar arguments as they are, so their formatting happens on the listener thread.
+
+    Any other arguments (dicts, lists, objects) could change before the listener gets
+    to the record, so those messages are formatted right away. Records are dropped
+    (and counted) when the queue is full, so logging never blocks the calling thread.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.__dropped = 0
+        self.__lock = threading.Lock()
+
+    def prepare(self, record):
+        if record.args and not (isinstance(record.args, tuple)
+                                and all(isinstance(arg, _SCALAR_TYPES) for arg in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.__lock:
+                self.__dropped += 1
+
+    def get_dropped_count(self):
+        return self.__dropped
+
+
+class _SampleFilter(logging.Filter):
+    """Keeps the records of one in every sample RPC calls, by the rpc_id passed in extra.
+
+    Warnings, errors and records without a rpc_id are always kept.
+    """
+
+    def __init__(self, sample):
+        super().__init__()
+        self.__sample = sample
+
+    def filter(self, record):
+        rpc_id = getattr(record, "rpc_id", None)
+        return rpc_id is None or record.levelno >= logging.WARNING or rpc_id % self.__sample == 0
+
+
+class _RateLimitFilter(logging.Filter):
+    """Drops records above rate per second (token bucket), warnings and errors are always kept."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.__rate = rate
+        self.__tokens = float(rate)
+        self.__last = time.monotonic()
+        self.__dropped = 0
+        self.__lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__rate, self.__tokens + (now - self.__last) * self.__rate)
+            self.__last = now
+            if self.__tokens < 1:
+                self.__dropped += 1
+                return False
+            self.__tokens -= 1
+
+        return True
+
+    def get_dropped_count(self):
+        return self.__dropped
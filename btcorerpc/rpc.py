@@ -1,8 +1,9 @@
 # Copyright (c) 2024-2025 Joel Torres
 # Distributed under the MIT License. See the accompanying file LICENSE.
 
-import json
 import re
+import logging
+import threading
 import requests
 from .exceptions import (BitcoinRpcValueError,
                          BitcoinRpcConnectionError,
@@ -12,9 +13,14 @@ from .exceptions import (BitcoinRpcValueError,
                          BitcoinRpcInvalidRequestError,
                          BitcoinRpcInternalError,
                          BitcoinRpcParseError,
-                         BitcoinRpcServerError)
-
-from requests.exceptions import ConnectionError, ConnectTimeout, TooManyRedirects
+                         BitcoinRpcServerError,
+                         BitcoinRpcTimeoutError)
+from .codec import JsonCodec
+from .singleflight import SingleFlight
+from . import deadline
+
+from requests.exceptions import ConnectionError, ConnectTimeout, TooManyRedirects, Timeout
+from urllib3.exceptions import ReadTimeoutError
 from . import logfactory
 
 _logger = logfactory.create(__name__)
@@ -26,17 +32,27 @@ _RPC_METHOD_NOT_FOUND_ERROR = -32601
 _RPC_METHOD_PARAMS_ERROR = -8
 _RPC_INTERNAL_ERROR = -32603
 _RPC_PARSE_ERROR = -32700
+# client side only, bitcoind error codes are always integers
+_RPC_TIMEOUT_ERROR = "timeout"
+_RPC_RESPONSE_ERROR = "response"
+
+_RESPONSE_CHUNK_SIZE = 16384
 
 class BitcoinRpc:
     
     def __init__(self, rpc_user: str, rpc_password: str, host_ip: str = "127.0.0.1", host_port: int = 8332,
-                 raw_json_response: bool = False):
+                 raw_json_response: bool = False, json_codec: JsonCodec = None, timeout=None,
+                 single_flight: bool = False, single_flight_ttl: dict = None):
 
         self.__rpc_user = rpc_user
         self.__rpc_password = rpc_password
         self.__host_ip = self.__validate_host_ip(host_ip)
         self.__host_port = self.__validate_host_port(host_port)
         self.__raw_json_response = self.__validate_raw_json_response(raw_json_response)
+        self.__json_codec = self.__validate_json_codec(json_codec)
+        self.__timeout = self.__validate_timeout(timeout)
+        self.__single_flight = SingleFlight() if self.__validate_single_flight(single_flight) else None
+        self.__single_flight_ttl = self.__validate_single_flight_ttl(single_flight_ttl)
 
         self.__rpc_url = self.__set_rpc_url()
         self.__rpc_headers = {
@@ -45,9 +61,11 @@ class BitcoinRpc:
         self.__rpc_id = 0
         self.__rpc_success = 0
         self.__rpc_errors = 0
+        self.__counter_lock = threading.Lock()
         self.__exception_codes = {
             _RPC_CONNECTION_ERROR: BitcoinRpcConnectionError,
             _RPC_AUTH_ERROR: BitcoinRpcAuthError,
+            _RPC_TIMEOUT_ERROR: BitcoinRpcTimeoutError,
             _RPC_METHOD_NOT_FOUND_ERROR: BitcoinRpcMethodNotFoundError,
             _RPC_METHOD_PARAMS_ERROR: BitcoinRpcMethodParamsError,
             _RPC_INVALID_REQUEST_ERROR: BitcoinRpcInvalidRequestError,
@@ -55,7 +73,7 @@ class BitcoinRpc:
             _RPC_PARSE_ERROR: BitcoinRpcParseError
         }
 
-        _logger.info(f"BitcoinRpc initialized, RPC url: {self.__rpc_url}")
+        _logger.info("BitcoinRpc initialized, RPC url: %s", self.__rpc_url)
 
     def __repr__(self):
         return (f"BitcoinRpc(rpc_user='{self.__rpc_user}', rpc_password='{self.__rpc_password}', "
@@ -105,34 +123,141 @@ class BitcoinRpc:
 
         return raw_json_response
 
+    def __validate_json_codec(self, json_codec: JsonCodec) -> JsonCodec:
+        if json_codec is None:
+            return JsonCodec()
+        if not isinstance(json_codec, JsonCodec):
+            raise BitcoinRpcValueError(f"Invalid value for json_codec: {json_codec}")
+
+        return json_codec
+
+    def __validate_timeout(self, timeout) -> tuple:
+        valid_value = lambda t: t is None or (isinstance(t, (int, float)) and not isinstance(t, bool) and t > 0)
+        if isinstance(timeout, tuple) and len(timeout) == 2 and all(valid_value(t) for t in timeout):
+            return timeout
+        if not isinstance(timeout, tuple) and valid_value(timeout):
+            return timeout, timeout
+
+        raise BitcoinRpcValueError(f"Invalid value for timeout: {timeout}")
+
+    def __validate_single_flight(self, single_flight: bool) -> bool:
+        if not isinstance(single_flight, bool):
+            raise BitcoinRpcValueError(f"Invalid value for single_flight: {single_flight}")
+
+        return single_flight
+
+    def __validate_single_flight_ttl(self, single_flight_ttl: dict) -> dict:
+        if single_flight_ttl is None:
+            return {}
+        valid_ttl = lambda t: isinstance(t, (int, float)) and not isinstance(t, bool) and t >= 0
+        if (not isinstance(single_flight_ttl, dict)
+                or not all(isinstance(method, str) and valid_ttl(ttl) for method, ttl in single_flight_ttl.items())):
+            raise BitcoinRpcValueError(f"Invalid value for single_flight_ttl: {single_flight_ttl}")
+
+        return dict(single_flight_ttl)
+
+    def __validate_calls(self, calls: list) -> list:
+        valid_call = lambda c: (isinstance(c, tuple) and len(c) == 2 and isinstance(c[0], str)
+                                and (c[1] is None or isinstance(c[1], list)))
+        if not isinstance(calls, list) or len(calls) == 0 or not all(valid_call(call) for call in calls):
+            raise BitcoinRpcValueError(f"Invalid value for calls: {calls}")
+
+        return calls
+
+    def __get_request_timeout(self) -> tuple:
+        connect_timeout, read_timeout = self.__timeout
+        remaining = deadline.get_remaining()
+        if remaining is not None:
+            connect_timeout = remaining if connect_timeout is None else min(connect_timeout, remaining)
+            read_timeout = remaining if read_timeout is None else min(read_timeout, remaining)
+
+        return connect_timeout, read_timeout
+
+    def __read_response(self, rpc_response: requests.Response) -> bytes:
+        # read in chunks so the response is dropped once the deadline runs out, even while data keeps coming
+        chunks = []
+        try:
+            for chunk in rpc_response.iter_content(_RESPONSE_CHUNK_SIZE):
+                chunks.append(chunk)
+                if deadline.get_remaining() == 0:
+                    raise Timeout("Deadline exceeded while reading response")
+        except ConnectionError as e:
+            # requests reports read timeouts on the body as connection errors
+            if e.args and isinstance(e.args[0], ReadTimeoutError):
+                raise Timeout(e) from None
+            raise
+        finally:
+            rpc_response.close()
+
+        return b"".join(chunks)
+
+    def __decode_response(self, response_content: bytes):
+        try:
+            return self.__json_codec.decode(response_content)
+        except ValueError:
+            # not JSON, e.g. the plain text 503 bitcoind sends when its work queue is full
+            return None
+
     def __rpc_call(self, method: str, params: list = None) -> dict:
         if params is None:
             params = []
-        self.__rpc_id += 1
-        _logger.info("RPC call start: id={}, method={}".format(self.__rpc_id, method))
+        single_flight = self.__single_flight
+        if single_flight is None:
+            return self.__rpc_request(method, params)
+
+        raw_json_response = self.__raw_json_response
+        key = (method, self.__json_codec.encode(params), raw_json_response)
+        try:
+            return single_flight.do(key, lambda: self.__rpc_request(method, params),
+                                    self.__single_flight_ttl.get(method, 0), _is_timeout)
+        except BitcoinRpcTimeoutError as e:
+            # in raw mode requests return their errors, so this was raised waiting on a shared call
+            if raw_json_response:
+                return self.__build_error(_RPC_TIMEOUT_ERROR, str(e), None)
+            raise
+
+    def __rpc_request(self, method: str, params: list) -> dict:
+        with self.__counter_lock:
+            self.__rpc_id += 1
+            rpc_id = self.__rpc_id
+        _logger.info("RPC call start: id=%d, method=%s", rpc_id, method, extra={"rpc_id": rpc_id})
+        request_timeout = self.__get_request_timeout()
+        if request_timeout[1] == 0:
+            return self.__rpc_call_error(self.__build_error(_RPC_TIMEOUT_ERROR,
+                                                          "Deadline exceeded before RPC call", rpc_id))
         try:
             rpc_response = requests.post(self.__rpc_url,
                                          auth=(self.__rpc_user, self.__rpc_password),
                                          headers=self.__rpc_headers,
-                                         json={"jsonrpc": "1.0", "id": self.__rpc_id,
-                                                "method": method, "params": params})
+                                         data=self.__json_codec.encode_request(rpc_id, method, params),
+                                         timeout=request_timeout, stream=True)
+            response_content = self.__read_response(rpc_response)
+
+        except Timeout:
+            return self.__rpc_call_error(self.__build_error(_RPC_TIMEOUT_ERROR,
+                                                          f"RPC call timed out ({self.__rpc_url})", rpc_id))
 
         except (ConnectionError, ConnectTimeout, TooManyRedirects):
             return self.__rpc_call_error(self.__build_error(_RPC_CONNECTION_ERROR,
                                                           f"Failed to establish connection "
-                                                          f"({self.__rpc_url})", self.__rpc_id))
+                                                          f"({self.__rpc_url})", rpc_id))
 
         status_code = rpc_response.status_code
-        response_text = rpc_response.text
-        if status_code == 401 and response_text == "":
+        if status_code == 401 and response_content == b"":
             return self.__rpc_call_error(self.__build_error(_RPC_AUTH_ERROR,
                                                           "Got empty payload and bad status code "
-                                                          "(possible wrong RPC credentials)", self.__rpc_id))
+                                                          "(possible wrong RPC credentials)", rpc_id))
+
+        rpc_data = self.__decode_response(response_content)
+        if not _is_rpc_response(rpc_data):
+            return self.__rpc_call_error(self.__build_error(_RPC_RESPONSE_ERROR,
+                                                          f"Invalid response (HTTP {status_code}): "
+                                                          f"{response_content[:100]!r}", rpc_id))
 
-        rpc_data = json.loads(response_text)
         if rpc_response.ok and not rpc_data["error"]:
-            self.__rpc_success += 1
-            _logger.info("RPC call success: id={}".format(self.__rpc_id))
+            with self.__counter_lock:
+                self.__rpc_success += 1
+            _logger.info("RPC call success: id=%d", rpc_id, extra={"rpc_id": rpc_id})
             if self.__raw_json_response:
                 return rpc_data
             else:
@@ -141,10 +266,11 @@ class BitcoinRpc:
             return self.__rpc_call_error(rpc_data)
 
     def __rpc_call_error(self, data: dict) -> dict:
-        self.__rpc_errors += 1
+        with self.__counter_lock:
+            self.__rpc_errors += 1
         code = data["error"]["code"]
         message = data["error"]["message"]
-        _logger.error("RPC call error: id={}, {}".format(self.__rpc_id, message))
+        _logger.error("RPC call error: id=%s, %s", data["id"], message)
         if self.__raw_json_response:
             return data
         else:
@@ -153,6 +279,91 @@ class BitcoinRpc:
             else:
                 raise BitcoinRpcServerError(message)
 
+    def __rpc_batch_call(self, calls: list) -> list:
+        calls = self.__validate_calls(calls)
+
+        with self.__counter_lock:
+            first_id = self.__rpc_id + 1
+            self.__rpc_id += len(calls)
+        payload = [(rpc_id, method, params) for rpc_id, (method, params) in enumerate(calls, first_id)]
+        rpc_ids = [call[0] for call in payload]
+        if _logger.isEnabledFor(logging.INFO):
+            _logger.info("RPC batch call start: ids=%d-%d, methods=%s", rpc_ids[0], rpc_ids[-1],
+                         ",".join(call[1] for call in payload), extra={"rpc_id": rpc_ids[0]})
+        request_timeout = self.__get_request_timeout()
+        if request_timeout[1] == 0:
+            return self.__rpc_batch_call_error([self.__build_error(_RPC_TIMEOUT_ERROR,
+                                                                   "Deadline exceeded before RPC call", rpc_id)
+                                                for rpc_id in rpc_ids])
+        try:
+            rpc_response = requests.post(self.__rpc_url,
+                                         auth=(self.__rpc_user, self.__rpc_password),
+                                         headers=self.__rpc_headers,
+                                         data=self.__json_codec.encode_batch(payload),
+                                         timeout=request_timeout, stream=True)
+            response_content = self.__read_response(rpc_response)
+
+        except Timeout:
+            return self.__rpc_batch_call_error([self.__build_error(_RPC_TIMEOUT_ERROR,
+                                                                   f"RPC call timed out ({self.__rpc_url})", rpc_id)
+                                                for rpc_id in rpc_ids])
+
+        except (ConnectionError, ConnectTimeout, TooManyRedirects):
+            return self.__rpc_batch_call_error([self.__build_error(_RPC_CONNECTION_ERROR,
+                                                                   f"Failed to establish connection "
+                                                                   f"({self.__rpc_url})", rpc_id)
+                                                for rpc_id in rpc_ids])
+
+        if rpc_response.status_code == 401 and response_content == b"":
+            return self.__rpc_batch_call_error([self.__build_error(_RPC_AUTH_ERROR,
+                                                                   "Got empty payload and bad status code "
+                                                                   "(possible wrong RPC credentials)", rpc_id)
+                                                for rpc_id in rpc_ids])
+
+        rpc_data = self.__decode_response(response_content)
+        if _is_rpc_response(rpc_data) and rpc_data["error"]:
+            # bitcoind rejected the batch as a whole
+            return self.__rpc_batch_call_error([dict(rpc_data, id=rpc_id) for rpc_id in rpc_ids])
+
+        if not isinstance(rpc_data, list) or not all(_is_rpc_response(response) for response in rpc_data):
+            return self.__rpc_batch_call_error([self.__build_error(_RPC_RESPONSE_ERROR,
+                                                                   f"Invalid response (HTTP {rpc_response.status_code}): "
+                                                                   f"{response_content[:100]!r}", rpc_id)
+                                                for rpc_id in rpc_ids])
+
+        responses = {response["id"]: response for response in rpc_data}
+        rpc_data = [responses.get(rpc_id) or self.__build_error(_RPC_INVALID_REQUEST_ERROR,
+                                                                "Missing response in batch", rpc_id)
+                    for rpc_id in rpc_ids]
+        errors = [response for response in rpc_data if response["error"]]
+        if errors:
+            return self.__rpc_batch_call_error(rpc_data)
+
+        with self.__counter_lock:
+            self.__rpc_success += len(rpc_data)
+        _logger.info("RPC batch call success: ids=%d-%d", rpc_ids[0], rpc_ids[-1], extra={"rpc_id": rpc_ids[0]})
+        if self.__raw_json_response:
+            return rpc_data
+        else:
+            return [response["result"] for response in rpc_data]
+
+    def __rpc_batch_call_error(self, data: list) -> list:
+        errors = [response for response in data if response["error"]]
+        with self.__counter_lock:
+            self.__rpc_success += len(data) - len(errors)
+            self.__rpc_errors += len(errors)
+        for response in errors:
+            _logger.error("RPC call error: id=%s, %s", response["id"], response["error"]["message"])
+        if self.__raw_json_response:
+            return data
+        else:
+            code = errors[0]["error"]["code"]
+            message = errors[0]["error"]["message"]
+            if code in self.__exception_codes:
+                raise self.__exception_codes[code](message) from None
+            else:
+                raise BitcoinRpcServerError(message)
+
     def __build_error(self, code: int, message: str, rpc_id: int) -> dict:
         return {
             "result": None,
@@ -263,6 +474,10 @@ class BitcoinRpc:
         """Returns the proof-of-work difficulty"""
         return self.__rpc_call("getdifficulty")
 
+    def batch_call(self, calls: list) -> list:
+        """Sends several RPC calls in one request, given as a list of (method, params) tuples."""
+        return self.__rpc_batch_call(calls)
+
     def get_rpc_total_count(self) -> int:
         return self.__rpc_id
 
@@ -274,10 +489,11 @@ class BitcoinRpc:
 
     def reset_rpc_counters(self) -> None:
         _logger.info("Resetting RPC counters")
-        self.__rpc_id = 0
-        self.__rpc_success = 0
-        self.__rpc_errors = 0
-        _logger.info(self)
+        with self.__counter_lock:
+            self.__rpc_id = 0
+            self.__rpc_success = 0
+            self.__rpc_errors = 0
+        _logger.info("%s", self)
 
     def get_rpc_user(self) -> str:
         return self.__rpc_user
@@ -316,3 +532,43 @@ class BitcoinRpc:
 
     def is_raw_json_response_enabled(self) -> bool:
         return self.__raw_json_response
+
+    def enable_single_flight(self) -> None:
+        if self.__single_flight is None:
+            self.__single_flight = SingleFlight()
+
+    def disable_single_flight(self) -> None:
+        self.__single_flight = None
+
+    def is_single_flight_enabled(self) -> bool:
+        return self.__single_flight is not None
+
+    def get_single_flight_ttl(self) -> dict:
+        return dict(self.__single_flight_ttl)
+
+    def set_single_flight_ttl(self, single_flight_ttl: dict) -> None:
+        self.__single_flight_ttl = self.__validate_single_flight_ttl(single_flight_ttl)
+        if self.__single_flight is not None:
+            self.__single_flight.clear()
+
+    def get_timeout(self) -> tuple:
+        return self.__timeout
+
+    def set_timeout(self, timeout) -> None:
+        self.__timeout = self.__validate_timeout(timeout)
+
+    def get_json_codec(self) -> JsonCodec:
+        return self.__json_codec
+
+    def set_json_codec(self, json_codec: JsonCodec) -> None:
+        self.__json_codec = self.__validate_json_codec(json_codec)
+
+
+def _is_rpc_response(data) -> bool:
+    return isinstance(data, dict) and "error" in data and "id" in data
+
+
+def _is_timeout(result, error) -> bool:
+    if error is not None:
+        return isinstance(error, BitcoinRpcTimeoutError)
+    return _is_rpc_response(result) and bool(result["error"]) and result["error"]["code"] == _RPC_TIMEOUT_ERROR
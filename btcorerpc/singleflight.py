@@ -0,0 +1,111 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import time
+import threading
+from . import deadline
+from .exceptions import BitcoinRpcTimeoutError
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters", "deadline_bound")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.deadline_bound = deadline.get_remaining() is not None
+
+
+class SingleFlight:
+    """Shares a single execution between concurrent calls with the same key.
+
+    The first caller for a key runs the function, the callers arriving while it is
+    in flight wait for it and get the same result, or their own copy of the same
+    exception. With a ttl, the result is also reused by calls made within ttl seconds
+    after it completed.
+
+    The shared call runs under the first caller's Deadline, so a timeout it hits
+    (as told by is_timeout) is not shared: waiting callers run the call again,
+    bounded only by their own deadlines.
+    """
+
+    def __init__(self):
+
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.__cache = {}
+
+    def __repr__(self):
+        return f"SingleFlight<in_flight={len(self.__calls)}, cached={len(self.__cache)}>"
+
+    def __purge_cache(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expiry, _) in self.__cache.items() if expiry <= now]:
+            del self.__cache[key]
+
+    def do(self, key, func, ttl: float = 0.0, is_timeout=None):
+        while True:
+            with self.__lock:
+                cached = self.__cache.get(key)
+                if cached is not None:
+                    if cached[0] > time.monotonic():
+                        return cached[1]
+                    del self.__cache[key]
+
+                call = self.__calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self.__calls[key] = _Call()
+                else:
+                    call.waiters += 1
+
+            if leader:
+                break
+
+            if not call.event.wait(deadline.get_remaining()):
+                raise BitcoinRpcTimeoutError("Deadline exceeded waiting for shared RPC call")
+            if call.deadline_bound and is_timeout is not None and is_timeout(call.result, call.error):
+                # the first caller ran out of its own budget, not ours
+                continue
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+                if ttl > 0 and call.error is None and not _is_error_response(call.result):
+                    self.__purge_cache()
+                    self.__cache[key] = (time.monotonic() + ttl, call.result)
+            call.event.set()
+
+        return call.result
+
+    def clear(self) -> None:
+        """Drops all cached results, in-flight calls are not affected."""
+        with self.__lock:
+            self.__cache.clear()
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    # each waiter raises its own instance, a shared one would collect every waiter's traceback
+    try:
+        copied = type(error)(*error.args)
+    except Exception:
+        # the constructor takes other arguments than the ones kept in args
+        copied = type(error).__new__(type(error), *error.args)
+        copied.args = error.args
+    copied.__dict__.update(error.__dict__)
+    return copied
+
+
+def _is_error_response(result) -> bool:
+    # raw JSON error responses are returned, not raised, and must never be cached
+    return isinstance(result, dict) and bool(result.get("error")) and "result" in result
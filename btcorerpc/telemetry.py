@@ -0,0 +1,299 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import time
+import threading
+from array import array
+from . import logfactory
+from .rpc import BitcoinRpc
+from .deadline import Deadline
+from .exceptions import BitcoinRpcError, BitcoinRpcValueError
+
+_logger = logfactory.create(__name__)
+
+_SAMPLE_FIELDS = {
+    "getnettotals": (("totalbytesrecv", lambda r: r["totalbytesrecv"]),
+                     ("totalbytessent", lambda r: r["totalbytessent"])),
+    "getpeerinfo": (("peers", len),
+                    ("peers_inbound", lambda r: sum(1 for peer in r if peer["inbound"]))),
+    "getmempoolinfo": (("mempool_size", lambda r: r["size"]),
+                       ("mempool_bytes", lambda r: r["bytes"]),
+                       ("mempool_usage", lambda r: r["usage"]),
+                       ("mempool_total_fee", lambda r: r.get("total_fee", 0))),
+    "getblockchaininfo": (("blocks", lambda r: r["blocks"]),
+                          ("headers", lambda r: r["headers"]),
+                          ("verificationprogress", lambda r: r["verificationprogress"]))
+}
+
+DEFAULT_METHODS = ("getnettotals", "getpeerinfo", "getmempoolinfo", "getblockchaininfo")
+
+
+class TelemetrySampler:
+    """Samples a set of RPC methods on a fixed interval, one batch request per tick.
+
+    Samples are kept in fixed-size ring buffers, so memory use is bounded by capacity.
+    A dedicated BitcoinRpc object should be given to the sampler, as changing its raw
+    JSON response setting from another thread would break the sampled responses.
+    """
+
+    def __init__(self, rpc_obj: BitcoinRpc, methods: tuple = DEFAULT_METHODS, interval: float = 1.0,
+                 capacity: int = 3600):
+
+        self.__rpc_obj = self.__validate_rpc_obj(rpc_obj)
+        self.__methods = self.__validate_methods(methods)
+        self.__interval = self.__validate_interval(interval)
+        self.__capacity = self.__validate_capacity(capacity)
+
+        self.__calls = [(method, []) for method in self.__methods]
+        self.__times = array("d", bytes(8 * self.__capacity))
+        # rates are computed from the monotonic clock, wall clock times are only reported
+        self.__monotonic_times = array("d", bytes(8 * self.__capacity))
+        self.__buffers = {}
+        self.__extractors = []
+        for i, method in enumerate(self.__methods):
+            for metric, extract in _SAMPLE_FIELDS[method]:
+                buffer = array("d", bytes(8 * self.__capacity))
+                self.__buffers[metric] = buffer
+                self.__extractors.append((i, buffer, extract))
+        self.__peer_index = (self.__methods.index("getpeerinfo")
+                             if "getpeerinfo" in self.__methods else None)
+        self.__peers = {}
+        self.__peers_prev = {}
+        self.__peers_elapsed = 0.0
+
+        self.__index = 0
+        self.__count = 0
+        self.__errors = 0
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+        _logger.info("TelemetrySampler initialized, methods: %s, interval: %s, capacity: %d",
+                     ",".join(self.__methods), self.__interval, self.__capacity)
+
+    def __repr__(self):
+        return (f"TelemetrySampler(methods={self.__methods}, interval={self.__interval}, "
+                f"capacity={self.__capacity})")
+
+    def __str__(self):
+        return f"TelemetrySampler<samples={self.__count}, errors={self.__errors}, running={self.is_running()}>"
+
+    def __validate_rpc_obj(self, rpc_obj: BitcoinRpc) -> BitcoinRpc:
+        if not isinstance(rpc_obj, BitcoinRpc):
+            raise BitcoinRpcValueError(f"Invalid value for rpc_obj: {rpc_obj}")
+
+        return rpc_obj
+
+    def __validate_methods(self, methods: tuple) -> tuple:
+        if (not isinstance(methods, (tuple, list)) or len(methods) == 0
+                or not set(methods).issubset(_SAMPLE_FIELDS) or len(set(methods)) != len(methods)):
+            raise BitcoinRpcValueError(f"Invalid value for methods: {methods}")
+
+        return tuple(methods)
+
+    def __validate_interval(self, interval: float) -> float:
+        if not isinstance(interval, (int, float)) or isinstance(interval, bool) or interval <= 0:
+            raise BitcoinRpcValueError(f"Invalid value for interval: {interval}")
+
+        return float(interval)
+
+    def __validate_capacity(self, capacity: int) -> int:
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 2:
+            raise BitcoinRpcValueError(f"Invalid value for capacity: {capacity}")
+
+        return capacity
+
+    def __run(self) -> None:
+        next_tick = time.monotonic()
+        while not self.__stop_event.is_set():
+            try:
+                self.sample()
+            except Exception:
+                # one bad tick must never stop the sampler
+                with self.__lock:
+                    self.__errors += 1
+                _logger.exception("Telemetry sample failed")
+            next_tick += self.__interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # tick overran the interval, skip the missed ticks instead of bursting
+                next_tick = time.monotonic()
+                delay = 0
+            self.__stop_event.wait(delay)
+
+    def __get_buffer(self, metric: str) -> array:
+        if metric not in self.__buffers:
+            raise BitcoinRpcValueError(f"Invalid value for metric: {metric}")
+
+        return self.__buffers[metric]
+
+    def __ordered(self, buffer: array) -> list:
+        if self.__count < self.__capacity:
+            return buffer[:self.__count].tolist()
+        return buffer[self.__index:].tolist() + buffer[:self.__index].tolist()
+
+    def __last_two(self, buffer: array) -> tuple:
+        last = (self.__index - 1) % self.__capacity
+        return buffer[last - 1], buffer[last]
+
+    def sample(self) -> bool:
+        """Runs one tick: fetches all methods in a single batch request and stores the values."""
+        try:
+            # a tick never outlives the interval, so slow ticks can't pile up
+            with Deadline(self.__interval):
+                responses = self.__rpc_obj.batch_call(self.__calls)
+            if self.__rpc_obj.is_raw_json_response_enabled():
+                if any(response["error"] for response in responses):
+                    raise BitcoinRpcError(next(response["error"]["message"]
+                                               for response in responses if response["error"]))
+                responses = [response["result"] for response in responses]
+
+            values = [extract(responses[response_index]) for response_index, _, extract in self.__extractors]
+            if self.__peer_index is not None:
+                peers = {peer["id"]: (peer["bytesrecv"], peer["bytessent"])
+                         for peer in responses[self.__peer_index]}
+        except (BitcoinRpcError, KeyError, IndexError, TypeError, ValueError) as e:
+            # unexpected result shapes (e.g. a null result) are counted like RPC errors
+            with self.__lock:
+                self.__errors += 1
+            _logger.error("Telemetry sample error: %s: %s", type(e).__name__, e)
+            return False
+
+        timestamp = time.time()
+        monotonic_timestamp = time.monotonic()
+        with self.__lock:
+            i = self.__index
+            self.__times[i] = timestamp
+            self.__monotonic_times[i] = monotonic_timestamp
+            for (_, buffer, _), value in zip(self.__extractors, values):
+                buffer[i] = value
+
+            if self.__peer_index is not None:
+                self.__peers_prev = self.__peers
+                self.__peers = peers
+                if self.__count > 0:
+                    self.__peers_elapsed = (monotonic_timestamp
+                                           - self.__monotonic_times[(i - 1) % self.__capacity])
+
+            self.__index = (i + 1) % self.__capacity
+            self.__count = min(self.__count + 1, self.__capacity)
+
+        return True
+
+    def start(self) -> None:
+        """Starts sampling on a background thread."""
+        if self.is_running():
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name="btcorerpc-telemetry", daemon=True)
+        self.__thread.start()
+        _logger.info("TelemetrySampler started")
+
+    def stop(self) -> None:
+        """Stops the background thread, waiting for the current tick to complete."""
+        if not self.is_running():
+            return
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None
+        _logger.info("TelemetrySampler stopped, %s", self)
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def get_metrics(self) -> list:
+        return list(self.__buffers)
+
+    def get_timestamps(self) -> list:
+        """Returns the sample timestamps, oldest first."""
+        with self.__lock:
+            return self.__ordered(self.__times)
+
+    def get_series(self, metric: str) -> list:
+        """Returns the stored values of a metric, oldest first."""
+        buffer = self.__get_buffer(metric)
+        with self.__lock:
+            return self.__ordered(buffer)
+
+    def get_latest(self) -> dict:
+        """Returns the most recent value of every metric."""
+        with self.__lock:
+            if self.__count == 0:
+                return {}
+            last = (self.__index - 1) % self.__capacity
+            return {metric: buffer[last] for metric, buffer in self.__buffers.items()}
+
+    def get_rate(self, metric: str) -> float:
+        """Returns the per second rate of a counter metric between the last two samples."""
+        buffer = self.__get_buffer(metric)
+        with self.__lock:
+            if self.__count < 2:
+                return 0.0
+            t0, t1 = self.__last_two(self.__monotonic_times)
+            v0, v1 = self.__last_two(buffer)
+
+        return _rate(v0, v1, t1 - t0)
+
+    def get_rates(self, metric: str) -> list:
+        """Returns the per second rate of a counter metric between every pair of samples, oldest first."""
+        buffer = self.__get_buffer(metric)
+        with self.__lock:
+            values = self.__ordered(buffer)
+            times = self.__ordered(self.__monotonic_times)
+
+        return [_rate(values[i - 1], values[i], times[i] - times[i - 1])
+                for i in range(1, len(values))]
+
+    def get_traffic_rate(self) -> dict:
+        """Returns node traffic in bytes per second."""
+        return {
+            "in": self.get_rate("totalbytesrecv"),
+            "out": self.get_rate("totalbytessent")
+        }
+
+    def get_peer_throughput(self) -> dict:
+        """Returns average traffic per connected peer in bytes per second."""
+        peers = self.get_latest().get("peers", 0)
+        traffic = self.get_traffic_rate()
+        if peers == 0:
+            return {"in": 0.0, "out": 0.0}
+
+        return {
+            "in": traffic["in"] / peers,
+            "out": traffic["out"] / peers
+        }
+
+    def get_peer_rates(self) -> dict:
+        """Returns traffic in bytes per second for each peer present in the last two samples."""
+        if self.__peer_index is None:
+            raise BitcoinRpcValueError("getpeerinfo is not a sampled method")
+
+        with self.__lock:
+            peers, peers_prev, elapsed = self.__peers, self.__peers_prev, self.__peers_elapsed
+
+        return {
+            peer_id: {
+                "in": _rate(peers_prev[peer_id][0], recv, elapsed),
+                "out": _rate(peers_prev[peer_id][1], sent, elapsed)
+            }
+            for peer_id, (recv, sent) in peers.items() if peer_id in peers_prev
+        }
+
+    def get_sample_count(self) -> int:
+        return self.__count
+
+    def get_error_count(self) -> int:
+        return self.__errors
+
+    def get_interval(self) -> float:
+        return self.__interval
+
+    def get_capacity(self) -> int:
+        return self.__capacity
+
+
+def _rate(v0: float, v1: float, elapsed: float) -> float:
+    # counters restart from zero if the node restarts
+    if elapsed <= 0 or v1 < v0:
+        return 0.0
+    return (v1 - v0) / elapsed
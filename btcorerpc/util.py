@@ -15,9 +15,10 @@ def _run_util(func):
             raw_json = True
             rpc_obj.disable_raw_json_response()
 
-        _logger.info(f"util start: {func.__name__}")
+        _logger.info("util start: %s", func.__name__)
         result = func(*args, **kwargs)
-        _logger.info(f"util end: {func.__name__}: {result}")
+        _logger.info("util end: %s", func.__name__)
+        _logger.debug("util result: %s: %s", func.__name__, result)
 
         if raw_json:
             rpc_obj.enable_raw_json_response()
@@ -19,6 +19,9 @@ setup(
     install_requires=[
         "requests>=2.32.4"
     ],
+    extras_require={
+        "fast": ["orjson>=3.9"]
+    },
     python_requires=">=3.8",
     classifiers=[
         "Development Status :: 4 - Beta",
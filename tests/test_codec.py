@@ -0,0 +1,64 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import json
+from decimal import Decimal
+import pytest
+from btcorerpc.codec import JsonCodec
+from btcorerpc.exceptions import BitcoinRpcValueError
+from utils import _create_rpc
+
+TEST_DATA = {
+    "response": b'{"result": {"fee": 0.00001234, "difficulty": 1.5, "vout": [{"value": 0.1, "n": 0}],'
+                b' "minfeefilter": 0.00001, "x": [[0.5]]},'
+                b' "error": null, "id": 1}'
+}
+
+def test_codec_encode_request():
+    for use_orjson in [True, False]:
+        codec = JsonCodec(use_orjson=use_orjson)
+
+        for _ in range(2):
+            request = json.loads(codec.encode_request(7, "getblock", ["00ff", 2]))
+            assert request == {"jsonrpc": "1.0", "id": 7, "method": "getblock", "params": ["00ff", 2]}
+
+        request = json.loads(codec.encode_request(8, "uptime", None))
+        assert request["params"] == []
+
+        batch = json.loads(codec.encode_batch([(1, "uptime", []), (2, "getblockhash", [0])]))
+        assert [request["id"] for request in batch] == [1, 2]
+
+def test_codec_decode():
+    result = JsonCodec().decode(TEST_DATA["response"])["result"]
+    assert result["fee"] == 0.00001234
+    assert result["vout"][0]["value"] == 0.1
+
+    result = JsonCodec("decimal").decode(TEST_DATA["response"])["result"]
+    assert result["fee"] == Decimal("0.00001234")
+    assert result["difficulty"] == Decimal("1.5")
+
+    result = JsonCodec("satoshi").decode(TEST_DATA["response"])["result"]
+    assert result["fee"] == 1234
+    assert result["vout"][0]["value"] == 10000000
+    assert type(result["difficulty"]) == float
+    assert result["minfeefilter"] == 1000
+    assert result["x"] == [[0.5]] and type(result["x"][0][0]) == float
+
+def test_codec_rpc_call():
+    rpc = _create_rpc()
+    rpc.set_json_codec(JsonCodec("satoshi"))
+
+    result = rpc.get_mem_pool_info()
+    assert result["error"] == None
+    assert type(result["result"]["minrelaytxfee"]) == int
+
+def test_codec_value_exception():
+    for amount_format in ["btc", 1, None]:
+        with pytest.raises(BitcoinRpcValueError):
+            JsonCodec(amount_format)
+
+    with pytest.raises(BitcoinRpcValueError):
+        JsonCodec(use_orjson="True")
+
+    with pytest.raises(BitcoinRpcValueError):
+        _create_rpc().set_json_codec("json")
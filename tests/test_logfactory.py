@@ -0,0 +1,90 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import queue
+import logging
+from btcorerpc.logfactory import (_SampleFilter, _RateLimitFilter, _LazyQueueHandler, _QueueListener,
+                                  _shutdown)
+
+def test_log_sample_filter():
+    log_filter = _SampleFilter(10)
+
+    kept = [rpc_id for rpc_id in range(1, 101)
+            if log_filter.filter(_create_record(logging.INFO, rpc_id))]
+    assert kept == list(range(10, 101, 10))
+
+    assert log_filter.filter(_create_record(logging.INFO))
+    assert log_filter.filter(_create_record(logging.ERROR, 1))
+
+def test_log_rate_limit_filter():
+    log_filter = _RateLimitFilter(5)
+
+    kept = [log_filter.filter(_create_record(logging.INFO)) for _ in range(20)]
+    assert kept.count(True) == 5
+    assert log_filter.get_dropped_count() == 15
+
+    assert log_filter.filter(_create_record(logging.ERROR))
+
+def test_log_lazy_queue_handler():
+    log_queue = queue.SimpleQueue()
+    handler = _LazyQueueHandler(log_queue)
+    record = _create_record(logging.INFO, 1)
+
+    handler.handle(record)
+    queued = log_queue.get_nowait()
+    assert queued is record
+    assert queued.args == (1,)
+    assert queued.getMessage() == "RPC call success: id=1"
+
+def test_log_lazy_queue_handler_snapshot():
+    log_queue = queue.SimpleQueue()
+    handler = _LazyQueueHandler(log_queue)
+    result = {"in": 1, "out": 2}
+    record = logging.LogRecord("btcorerpc.util", logging.DEBUG, __file__, 0,
+                               "util result: %s: %s", ("get_node_traffic", result), None)
+
+    handler.handle(record)
+    result["in"] = 100
+    queued = log_queue.get_nowait()
+    assert queued.args is None
+    assert queued.getMessage() == "util result: get_node_traffic: {'in': 1, 'out': 2}"
+
+def test_log_lazy_queue_handler_full():
+    log_queue = queue.Queue(maxsize=2)
+    handler = _LazyQueueHandler(log_queue)
+
+    for rpc_id in range(1, 6):
+        handler.handle(_create_record(logging.INFO, rpc_id))
+
+    assert log_queue.qsize() == 2
+    assert handler.get_dropped_count() == 3
+
+def test_log_shutdown():
+    log_queue = queue.Queue(maxsize=1)
+    queue_handler = _LazyQueueHandler(log_queue)
+    rate_filter = _RateLimitFilter(1)
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+
+    for rpc_id in range(1, 4):
+        if rate_filter.filter(_create_record(logging.INFO, rpc_id)):
+            queue_handler.handle(_create_record(logging.INFO, rpc_id))
+    queue_handler.handle(_create_record(logging.ERROR, 4))
+
+    # stopping must not fail with a full queue
+    listener = _QueueListener(log_queue, handler)
+    listener.start()
+    _shutdown(logging.getLogger("btcorerpc.rpc"), [handler], listener, queue_handler, rate_filter)
+
+    assert [record.getMessage() for record in records] == [
+        "RPC call success: id=1",
+        "Log records dropped: queue full: 1, rate limit: 2"
+    ]
+    assert records[-1].levelno == logging.WARNING
+
+def _create_record(level, rpc_id=None):
+    record = logging.LogRecord("btcorerpc.rpc", level, __file__, 0, "RPC call success: id=%s", (rpc_id,), None)
+    if rpc_id is not None:
+        record.rpc_id = rpc_id
+    return record
@@ -2,16 +2,21 @@
 # Distributed under the MIT License. See the accompanying file LICENSE.
 
 import os
+import threading
 from types import MethodType
 import pytest
+import requests
 from btcorerpc.rpc import BitcoinRpc
+from btcorerpc.deadline import Deadline
 from btcorerpc.exceptions import (BitcoinRpcConnectionError,
                                   BitcoinRpcAuthError,
                                   BitcoinRpcValueError,
                                   BitcoinRpcMethodNotFoundError,
-                                  BitcoinRpcMethodParamsError)
+                                  BitcoinRpcMethodParamsError,
+                                  BitcoinRpcServerError,
+                                  BitcoinRpcTimeoutError)
 
-from utils import _create_rpc, BITCOIN_RPC_USER, BITCOIN_RPC_PASSWORD, BITCOIN_RPC_IP
+from utils import _create_rpc, _fake_post, BITCOIN_RPC_USER, BITCOIN_RPC_PASSWORD, BITCOIN_RPC_IP
 
 TEST_DATA = {
     "rpc_ip": BITCOIN_RPC_IP,
@@ -110,6 +115,20 @@ def test_rpc_value_exception():
     with pytest.raises(BitcoinRpcValueError):
         rpc2 = BitcoinRpc(*TEST_DATA["rpc_credentials"], raw_json_response="False")
 
+    for timeout in [0, -1, "10", (10,), (10, 0), True]:
+        with pytest.raises(BitcoinRpcValueError):
+            rpc.set_timeout(timeout)
+
+    with pytest.raises(BitcoinRpcValueError):
+        Deadline(-1)
+
+    with pytest.raises(BitcoinRpcValueError):
+        BitcoinRpc(*TEST_DATA["rpc_credentials"], single_flight="True")
+
+    for ttl in [{"getblockcount": -1}, {"getblockcount": "1"}, {1: 1}, ["getblockcount"]]:
+        with pytest.raises(BitcoinRpcValueError):
+            rpc.set_single_flight_ttl(ttl)
+
 def test_rpc_method_not_found_exception():
     rpc = _create_rpc()
     rpc.disable_raw_json_response()
@@ -174,6 +193,105 @@ def test_rpc_mem_pool_methods():
     _assert_rpc_no_error(results)
     _assert_rpc_stats(rpc, 8, 8, 0)
 
+def test_rpc_batch_call():
+    rpc = _create_rpc()
+
+    calls = [("getblockcount", None), ("getnettotals", []), ("getmemoryinfo", ["stats"])]
+    results = rpc.batch_call(calls)
+
+    assert len(results) == len(calls)
+    _assert_rpc_no_error(results)
+    _assert_rpc_stats(rpc, 3, 3, 0)
+
+    rpc.disable_raw_json_response()
+    with pytest.raises(BitcoinRpcMethodNotFoundError):
+        rpc.batch_call([("getblockcount", None), ("invalidmethod", None)])
+
+    _assert_rpc_stats(rpc, 5, 4, 1)
+
+    for calls in ([], ["getblockcount"], [("getblockcount",)], [(1, None)], [("getblockcount", "stats")]):
+        with pytest.raises(BitcoinRpcValueError):
+            rpc.batch_call(calls)
+
+    _assert_rpc_stats(rpc, 5, 4, 1)
+
+def test_rpc_timeout():
+    rpc = BitcoinRpc(*TEST_DATA["rpc_credentials"], host_ip=TEST_DATA["rpc_ip"], timeout=30)
+    assert rpc.get_timeout() == (30, 30)
+
+    rpc.set_timeout((5, None))
+    assert rpc.get_timeout() == (5, None)
+
+    with Deadline(10) as deadline:
+        rpc.uptime()
+        assert 0 < deadline.get_remaining() < 10
+
+    with Deadline(0):
+        for method in TEST_DATA["methods"]:
+            with pytest.raises(BitcoinRpcTimeoutError):
+                eval("rpc.{}()".format(method))
+
+        with pytest.raises(BitcoinRpcTimeoutError):
+            rpc.batch_call([("uptime", None)])
+
+    _assert_rpc_stats(rpc, METHOD_COUNT + 2, 1, METHOD_COUNT + 1)
+
+def test_rpc_single_flight():
+    rpc = _create_rpc()
+    rpc.enable_single_flight()
+    assert rpc.is_single_flight_enabled()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(rpc.get_best_block_hash()))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _assert_rpc_no_error(results)
+    assert len(results) == 10
+    assert len({result["result"] for result in results}) == 1
+
+    rpc.reset_rpc_counters()
+    rpc.set_single_flight_ttl({"getblockchaininfo": 60})
+    for _ in range(3):
+        _assert_rpc_no_error([rpc.get_blockchain_info()])
+    _assert_rpc_stats(rpc, 1, 1, 0)
+
+    rpc.disable_single_flight()
+    rpc.get_blockchain_info()
+    _assert_rpc_stats(rpc, 2, 2, 0)
+
+def test_rpc_server_type_error(monkeypatch):
+    # bitcoind's RPC_TYPE_ERROR (-3) must not be mistaken for a client timeout
+    rpc = _create_rpc()
+    monkeypatch.setattr(requests, "post", _fake_post(500, b'{"result": null, "error": {"code": -3, "message": '
+                                                          b'"JSON value of type string is not of expected type '
+                                                          b'number"}, "id": 1}'))
+
+    assert rpc.get_block_hash("10")["error"]["code"] == -3
+
+    rpc.disable_raw_json_response()
+    with pytest.raises(BitcoinRpcServerError) as e:
+        rpc.get_block_hash("10")
+    assert not isinstance(e.value, BitcoinRpcTimeoutError)
+
+def test_rpc_invalid_response(monkeypatch):
+    rpc = _create_rpc()
+    monkeypatch.setattr(requests, "post", _fake_post(503, b"Work queue depth exceeded"))
+
+    assert rpc.uptime()["error"]["code"] == "response"
+
+    rpc.disable_raw_json_response()
+    with pytest.raises(BitcoinRpcServerError):
+        rpc.uptime()
+
+    with pytest.raises(BitcoinRpcServerError):
+        rpc.batch_call([("uptime", None), ("getblockcount", None)])
+
+    _assert_rpc_stats(rpc, 4, 0, 4)
+
 
 def _assert_rpc_stats(rpc_obj, total, success, error):
     assert rpc_obj.get_rpc_total_count() == total
@@ -0,0 +1,127 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import time
+import threading
+from btcorerpc.singleflight import SingleFlight
+from btcorerpc.deadline import Deadline, get_remaining
+from btcorerpc.exceptions import BitcoinRpcServerError, BitcoinRpcTimeoutError
+
+THREAD_COUNT = 10
+
+def test_single_flight_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def func():
+        executions.append(1)
+        release.wait()
+        return {"blocks": 100}
+
+    results = _run_threads(flight, func, release)
+
+    assert len(executions) == 1
+    assert len(results) == THREAD_COUNT
+    assert all(result is results[0] for result in results)
+
+def test_single_flight_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+    error = BitcoinRpcServerError("Work queue depth exceeded")
+
+    def func():
+        executions.append(1)
+        release.wait()
+        raise error
+
+    results = _run_threads(flight, func, release)
+
+    assert len(executions) == 1
+    assert len(results) == THREAD_COUNT
+    assert all(type(result) is BitcoinRpcServerError and str(result) == str(error) for result in results)
+    # waiters get their own copy, not the instance the first caller raised
+    assert len({id(result) for result in results}) == THREAD_COUNT
+
+def test_single_flight_ttl():
+    flight = SingleFlight()
+    executions = []
+
+    def func():
+        executions.append(1)
+        return len(executions)
+
+    assert flight.do("key", func, ttl=60) == 1
+    assert flight.do("key", func, ttl=60) == 1
+    flight.clear()
+    assert flight.do("key", func) == 2
+    assert flight.do("key", func) == 3
+
+def test_single_flight_leader_deadline():
+    flight = SingleFlight()
+    results = {}
+    executions = []
+
+    def func():
+        executions.append(1)
+        if len(executions) == 1:
+            _wait_for_waiters(flight, "key", 1)
+        remaining = get_remaining()
+        if remaining is not None:
+            time.sleep(remaining)
+            raise BitcoinRpcTimeoutError("Deadline exceeded")
+        return "result"
+
+    def leader():
+        try:
+            with Deadline(0.2):
+                results["leader"] = _do(flight, func)
+        except BitcoinRpcTimeoutError as e:
+            results["leader"] = e
+
+    def follower():
+        results["follower"] = _do(flight, func)
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    _wait_for_flight(flight, "key")
+    follower_thread = threading.Thread(target=follower)
+    follower_thread.start()
+    leader_thread.join()
+    follower_thread.join()
+
+    assert isinstance(results["leader"], BitcoinRpcTimeoutError)
+    assert results["follower"] == "result"
+    assert len(executions) == 2
+
+def _do(flight, func):
+    return flight.do("key", func, is_timeout=lambda result, error: isinstance(error, BitcoinRpcTimeoutError))
+
+def _run_threads(flight, func, release):
+    results = []
+
+    def call():
+        try:
+            results.append(flight.do("key", func))
+        except BitcoinRpcServerError as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(THREAD_COUNT)]
+    for thread in threads:
+        thread.start()
+    _wait_for_waiters(flight, "key", THREAD_COUNT - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+def _wait_for_flight(flight, key):
+    while key not in flight._SingleFlight__calls:
+        time.sleep(0.001)
+
+def _wait_for_waiters(flight, key, count):
+    _wait_for_flight(flight, key)
+    while flight._SingleFlight__calls[key].waiters < count:
+        time.sleep(0.001)
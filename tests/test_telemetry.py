@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Joel Torres
+# Distributed under the MIT License. See the accompanying file LICENSE.
+
+import time
+import threading
+import pytest
+import requests
+from types import SimpleNamespace
+from btcorerpc import telemetry
+from btcorerpc.telemetry import TelemetrySampler, DEFAULT_METHODS
+from btcorerpc.exceptions import BitcoinRpcValueError
+from utils import _create_rpc, _fake_post
+
+def test_telemetry_sample():
+    sampler = TelemetrySampler(_create_rpc(), capacity=3)
+
+    for _ in range(4):
+        assert sampler.sample()
+        time.sleep(0.1)
+
+    assert sampler.get_sample_count() == 3
+    assert sampler.get_error_count() == 0
+    assert len(sampler.get_timestamps()) == 3
+    assert len(sampler.get_rates("totalbytesrecv")) == 2
+
+    latest = sampler.get_latest()
+    for metric in sampler.get_metrics():
+        assert metric in latest
+        assert len(sampler.get_series(metric)) == 3
+
+    assert latest["peers"] > 0
+    _assert_rate_result(sampler.get_traffic_rate())
+    _assert_rate_result(sampler.get_peer_throughput())
+    for rate in sampler.get_peer_rates().values():
+        _assert_rate_result(rate)
+
+def test_telemetry_thread():
+    sampler = TelemetrySampler(_create_rpc(), methods=("getnettotals",), interval=0.2)
+
+    sampler.start()
+    assert sampler.is_running()
+    time.sleep(1)
+    sampler.stop()
+    assert not sampler.is_running()
+
+    assert sampler.get_sample_count() >= 3
+    assert sampler.get_metrics() == ["totalbytesrecv", "totalbytessent"]
+
+def test_telemetry_bad_sample(monkeypatch):
+    sampler = TelemetrySampler(_create_rpc(), methods=("getnettotals", "getpeerinfo"))
+
+    monkeypatch.setattr(requests, "post", _fake_post(503, b"Work queue depth exceeded"))
+    assert not sampler.sample()
+
+    monkeypatch.setattr(requests, "post", _fake_post(200, b'[{"result": null, "error": null, "id": 3},'
+                                                          b' {"result": null, "error": null, "id": 4}]'))
+    assert not sampler.sample()
+
+    assert sampler.get_sample_count() == 0
+    assert sampler.get_error_count() == 2
+
+def test_telemetry_concurrent_errors(monkeypatch):
+    sampler = TelemetrySampler(_create_rpc(), methods=("getnettotals",))
+    monkeypatch.setattr(requests, "post", _fake_post(503, b"Work queue depth exceeded"))
+
+    def run():
+        for _ in range(25):
+            sampler.sample()
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sampler.get_error_count() == 200
+
+def test_telemetry_clock_step(monkeypatch):
+    sampler = TelemetrySampler(_create_rpc(), methods=("getnettotals",))
+
+    wall_clock = iter([2000.0, 1000.0])
+    monkeypatch.setattr(telemetry, "time", SimpleNamespace(time=lambda: next(wall_clock),
+                                                           monotonic=time.monotonic))
+    for rpc_id, total in [(1, 1000), (2, 3000)]:
+        monkeypatch.setattr(requests, "post", _fake_post(200, b'[{"result": {"totalbytesrecv": %d, '
+                                                              b'"totalbytessent": 0}, "error": null, "id": %d}]'
+                                                              % (total, rpc_id)))
+        assert sampler.sample()
+        time.sleep(0.1)
+
+    # a wall clock stepped back must not zero the rates
+    assert sampler.get_timestamps() == [2000.0, 1000.0]
+    assert sampler.get_rate("totalbytesrecv") > 0
+    assert sampler.get_rates("totalbytesrecv")[0] > 0
+
+def test_telemetry_value_exception():
+    rpc = _create_rpc()
+
+    for methods in [(), ("getblock",), DEFAULT_METHODS + ("getnettotals",), "getnettotals"]:
+        with pytest.raises(BitcoinRpcValueError):
+            TelemetrySampler(rpc, methods=methods)
+
+    for interval in [0, -1, "1"]:
+        with pytest.raises(BitcoinRpcValueError):
+            TelemetrySampler(rpc, interval=interval)
+
+    for capacity in [0, 1, 1.5]:
+        with pytest.raises(BitcoinRpcValueError):
+            TelemetrySampler(rpc, capacity=capacity)
+
+    with pytest.raises(BitcoinRpcValueError):
+        TelemetrySampler(rpc, methods=("getnettotals",)).get_series("peers")
+
+    with pytest.raises(BitcoinRpcValueError):
+        TelemetrySampler(rpc, methods=("getnettotals",)).get_peer_rates()
+
+def _assert_rate_result(result):
+    for key in ("in", "out"):
+        assert key in result
+        assert result[key] >= 0
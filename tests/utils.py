@@ -1,7 +1,9 @@
 # Copyright (c) 2025 Joel Torres
 # Distributed under the MIT License. See the accompanying file LICENSE.
 
+import io
 import os
+import requests
 from btcorerpc.rpc import BitcoinRpc
 
 BITCOIN_RPC_IP = os.getenv("BITCOIN_RPC_IP")
@@ -11,3 +13,12 @@ BITCOIN_RPC_PASSWORD = os.getenv("BITCOIN_RPC_PASSWORD")
 def _create_rpc():
     return BitcoinRpc(BITCOIN_RPC_USER, BITCOIN_RPC_PASSWORD,
                       host_ip=BITCOIN_RPC_IP, raw_json_response=True)
+
+def _fake_post(status_code, body):
+    def post(*args, **kwargs):
+        response = requests.Response()
+        response.status_code = status_code
+        response.raw = io.BytesIO(body)
+        return response
+
+    return post